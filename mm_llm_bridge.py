@@ -27,8 +27,24 @@ import os
 import re
 import sys
 import time
-import urllib.request
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import http.client
+
+try:  # optional: faster JSON if available, stdlib json otherwise
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _env(name: str, default: str) -> str:
+    return os.environ.get(name, default).strip()
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return _env(name, default).lower() not in ("0", "false")
+
 
 # ----------------------------
 # CONFIG (edit these)
@@ -39,64 +55,112 @@ AGENT_TRIGGERS = ["!ask", "@claw", "@ai"]
 HELP_TRIGGERS = ["!ask help", "@claw help", "@ai help"]
 
 # Provider selection: "openai_compat" or "ollama"
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai_compat").strip().lower()
+LLM_PROVIDER = _env("LLM_PROVIDER", "openai_compat").lower()
 
 # Endpoint:
 # - openai_compat: can be full "/v1/chat/completions" or base URL (we append)
 # - ollama: can be full "/api/generate" or base URL (we append)
-LLM_ENDPOINT = os.getenv("LLM_ENDPOINT", "http://127.0.0.1:8000").strip()
+LLM_ENDPOINT = _env("LLM_ENDPOINT", "http://127.0.0.1:8000")
 
 # Model name (provider dependent)
-LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini").strip()
+LLM_MODEL = _env("LLM_MODEL", "gpt-4o-mini")
 
 # API key (optional; many local providers don't require)
-LLM_API_KEY = os.getenv("LLM_API_KEY", "").strip()
+LLM_API_KEY = _env("LLM_API_KEY", "")
 
 # Keep responses short for radio text
-SYSTEM_PROMPT = os.getenv(
+SYSTEM_PROMPT = _env(
     "LLM_SYSTEM_PROMPT",
     "You are a helpful assistant. Keep answers concise and suitable for short radio text messages.",
-).strip()
+)
 
 # Runtime controls
-REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT", "8.0"))
-HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
-HTTP_RETRY_SLEEP_SECONDS = float(os.getenv("HTTP_RETRY_SLEEP_SECONDS", "0.5"))
+REQUEST_TIMEOUT_SECONDS = float(_env("LLM_TIMEOUT", "8.0"))
+HTTP_RETRIES = int(_env("HTTP_RETRIES", "2"))
+# Base delay for exponential backoff between retries (doubles each retry, capped at 2s)
+HTTP_RETRY_SLEEP_SECONDS = float(_env("HTTP_RETRY_SLEEP_SECONDS", "0.25"))
 
 # Limits: keep each returned chunk under typical MeshMonitor/Meshtastic constraints
-MAX_MSG_CHARS = int(os.getenv("MAX_MSG_CHARS", "200"))
-MAX_MSG_BYTES = int(os.getenv("MAX_MSG_BYTES", "200"))
+MAX_MSG_CHARS = int(_env("MAX_MSG_CHARS", "200"))
+MAX_MSG_BYTES = int(_env("MAX_MSG_BYTES", "200"))
 
 # Avoid mesh spam
-MAX_CHUNKS = int(os.getenv("MAX_CHUNKS", "4"))
+MAX_CHUNKS = int(_env("MAX_CHUNKS", "4"))
+
+SPLIT_LONG_RESPONSES = _env_flag("SPLIT_LONG_RESPONSES", "1")
+TRUNCATE_WITH_ELLIPSIS = _env_flag("TRUNCATE_WITH_ELLIPSIS", "1")
 
-SPLIT_LONG_RESPONSES = os.getenv("SPLIT_LONG_RESPONSES", "1").strip().lower() not in ("0", "false")
-TRUNCATE_WITH_ELLIPSIS = os.getenv("TRUNCATE_WITH_ELLIPSIS", "1").strip().lower() not in ("0", "false")
+# Long-lived mode: serve length-prefixed requests on stdin instead of exiting
+# after one message (see serve()). Off unless explicitly enabled; MeshMonitor
+# runs one-shot and would get no output if this were on by mistake.
+DAEMON_MODE = _env("MM_LLM_BRIDGE_DAEMON", "0").lower() in ("1", "true", "yes")
 
 # ----------------------------
 # Utilities
 # ----------------------------
 
+# Precompiled once at import instead of on every call.
+# Help triggers match the whole message case-insensitively; agent triggers are
+# case-sensitive prefixes tried in list order, optionally followed by ":" or "-".
+_TRIGGER_RE = re.compile(
+    r"(?i:(?P<help>" + "|".join(map(re.escape, HELP_TRIGGERS)) + r"))\Z"
+    r"|(?P<trig>" + "|".join(map(re.escape, AGENT_TRIGGERS)) + r")\s*(?:[:\-]\s*)?(?P<rest>.*)",
+    re.DOTALL,
+)
+_MULTI_WS_RE = re.compile(r"[ \t]{2,}")
+_MULTI_NL_RE = re.compile(r"\n{3,}")
+
+if orjson is not None:
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+else:
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    _json_loads = json.loads
+
+
+def out_json(result: Dict[str, Any]) -> None:
+    sys.stdout.buffer.write(_json_dumps(result))
+    sys.stdout.buffer.flush()
 
-def out_single(msg: str) -> None:
-    sys.stdout.write(json.dumps({"response": msg}, ensure_ascii=False))
-    sys.stdout.flush()
 
+def as_result(chunks: List[str]) -> Dict[str, Any]:
+    """MeshMonitor output object: "response" for one chunk, "responses" for several."""
+    return {"response": chunks[0]} if len(chunks) == 1 else {"responses": chunks}
 
-def out_multi(msgs: List[str]) -> None:
-    sys.stdout.write(json.dumps({"responses": msgs}, ensure_ascii=False))
-    sys.stdout.flush()
+
+def _utf8_len(text: str) -> int:
+    """UTF-8 byte length; pure-ASCII text (the common case) needs no encode."""
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
 
 
 def clamp_utf8(text: str, max_chars: int, max_bytes: int) -> str:
     """Clamp text to both max chars and UTF-8 bytes."""
     if len(text) > max_chars:
         text = text[:max_chars]
-    if len(text.encode("utf-8")) <= max_bytes:
+    # A UTF-8 char is at most 4 bytes, so short enough text cannot exceed the limit.
+    if len(text) * 4 <= max_bytes:
+        return text
+    if text.isascii():
+        if len(text) <= max_bytes:
+            return text
+        return text[:max_bytes] if max_bytes > 0 else ""
+    b = text.encode("utf-8")
+    if len(b) <= max_bytes:
         return text
-    while text and len(text.encode("utf-8")) > max_bytes:
-        text = text[:-1]
-    return text
+    if max_bytes <= 0:
+        return ""
+    # Back up from the cut to the lead byte of the char it splits
+    # (continuation bytes are 0b10xxxxxx; at most 3 steps).
+    cut = max_bytes
+    while cut > 0 and (b[cut] & 0xC0) == 0x80:
+        cut -= 1
+    return b[:cut].decode("utf-8")
 
 
 def split_meshtastic(text: str, max_chars: int, max_bytes: int) -> List[str]:
@@ -108,40 +172,62 @@ def split_meshtastic(text: str, max_chars: int, max_bytes: int) -> List[str]:
     if not text:
         return [""]
 
-    if len(text) <= max_chars and len(text.encode("utf-8")) <= max_bytes:
+    if len(text) <= max_chars and _utf8_len(text) <= max_bytes:
         return [text]
 
+    # Walk a byte cursor over the encoded text so the byte budget is applied
+    # by UTF-8 boundary arithmetic rather than by re-encoding candidates.
+    b = text.encode("utf-8")
+    nb = len(b)
+    # A char is at most 4 bytes, so no candidate needs a wider byte window.
+    span = min(max_bytes, 4 * max_chars)
+    if span <= 0:
+        # Non-positive limits leave no room for any chunk (and a negative span
+        # would wrap the slice below).
+        return [""]
     chunks: List[str] = []
-    remaining = text
-
-    while remaining:
-        candidate = clamp_utf8(remaining[:max_chars], max_chars, max_bytes)
+    bi = 0
+
+    while bi < nb:
+        end = bi + span
+        if end >= nb:
+            end = nb
+        else:
+            # Back up to a char boundary (continuation bytes are 0b10xxxxxx).
+            while end > bi and (b[end] & 0xC0) == 0x80:
+                end -= 1
+        candidate = b[bi:end].decode("utf-8")
+        if len(candidate) > max_chars:
+            candidate = candidate[:max_chars]
         if not candidate:
             break
 
-        # Prefer whitespace split near the end
-        cut = len(candidate)
-        ws = candidate.rfind(" ")
-        if ws >= max(10, int(0.4 * len(candidate))):
-            cut = ws
+        # Prefer whitespace split near the end; only search where a cut is allowed
+        ws = candidate.rfind(" ", max(10, int(0.4 * len(candidate))))
+        cut = ws if ws >= 0 else len(candidate)
 
         part = candidate[:cut].rstrip()
         if not part:
             part = candidate
-
-        part = clamp_utf8(part, max_chars, max_bytes)
         chunks.append(part)
 
-        remaining = remaining[len(part) :].lstrip()
+        # Advance past the chunk, then skip whitespace (lstrip)
+        bi += _utf8_len(part)
+        while bi < nb:
+            c = b[bi]
+            w = 1 if c < 0x80 else 2 if c < 0xE0 else 3 if c < 0xF0 else 4
+            if not b[bi : bi + w].decode("utf-8").isspace():
+                break
+            bi += w
 
-        if len(chunks) >= MAX_CHUNKS and remaining:
+        if len(chunks) >= MAX_CHUNKS and bi < nb:
             if TRUNCATE_WITH_ELLIPSIS:
                 ell = "…"
                 last = chunks[-1].rstrip()
                 last = clamp_utf8(
                     last,
                     max_chars - len(ell),
-                    max_bytes - len(ell.encode("utf-8")),
+                    max_bytes - _utf8_len(ell),
                 )
                 chunks[-1] = (last + ell) if last else ell
             break
@@ -149,42 +235,54 @@ def split_meshtastic(text: str, max_chars: int, max_bytes: int) -> List[str]:
     return chunks if chunks else [""]
 
 
-def read_stdin_json() -> Dict[str, Any]:
-    raw = sys.stdin.read().strip()
+def parse_payload(raw: bytes) -> Dict[str, Any]:
+    raw = raw.strip()
     if not raw:
         return {}
     try:
-        return json.loads(raw)
+        return _json_loads(raw)
     except Exception:
         # If MeshMonitor ever passes plain text, wrap it.
-        return {"message": raw}
+        return {"message": raw.decode("utf-8", errors="replace")}
+
+
+def read_stdin_json() -> Dict[str, Any]:
+    return parse_payload(sys.stdin.buffer.read())
+
+
+# Where MeshMonitor payloads may carry the incoming text, in priority order.
+_MESSAGE_KEYS = ("message", "text", "msg", "body", "content")
+_MESSAGE_PATHS = (
+    ("packet", "decoded", "payload", "text"),
+    ("packet", "decoded", "payload", "message"),
+    ("packet", "decoded", "text"),
+    ("decoded", "payload", "text"),
+    ("decoded", "text"),
+    ("payload", "text"),
+)
+
+
+def _dig(obj: Any, path: Tuple[str, ...]) -> Optional[str]:
+    cur = obj
+    for p in path:
+        cur = cur.get(p) if type(cur) is dict else None
+        if cur is None:
+            return None
+    return cur.strip() if type(cur) is str else None
 
 
 def extract_message(payload: Dict[str, Any]) -> str:
     """Defensive extraction of incoming text from common MeshMonitor payload keys."""
-    for k in ("message", "text", "msg", "body", "content"):
-        v = payload.get(k)
-        if isinstance(v, str) and v.strip():
-            return v.strip()
-
-    def dig(obj: Any, path: List[str]) -> Optional[str]:
-        cur = obj
-        for p in path:
-            if not isinstance(cur, dict) or p not in cur:
-                return None
-            cur = cur[p]
-        return cur.strip() if isinstance(cur, str) else None
-
-    candidates = [
-        ["packet", "decoded", "payload", "text"],
-        ["packet", "decoded", "payload", "message"],
-        ["packet", "decoded", "text"],
-        ["decoded", "payload", "text"],
-        ["decoded", "text"],
-        ["payload", "text"],
-    ]
-    for path in candidates:
-        s = dig(payload, path)
+    get = payload.get
+    for k in _MESSAGE_KEYS:
+        v = get(k)
+        if type(v) is str:
+            v = v.strip()
+            if v:
+                return v
+
+    for path in _MESSAGE_PATHS:
+        s = _dig(payload, path)
         if s:
             return s
 
@@ -200,108 +298,371 @@ def parse_prompt(msg: str) -> Tuple[Optional[str], Optional[str]]:
     if not m:
         return (None, None)
 
-    lower = m.lower()
-    for ht in HELP_TRIGGERS:
-        if lower == ht.lower():
-            return ("help", "")
-
-    for trig in AGENT_TRIGGERS:
-        if m.startswith(trig):
-            rest = m[len(trig) :].strip()
-            # allow "@claw: hi" or "@claw- hi"
-            rest = re.sub(r"^[:\-]\s*", "", rest)
-            return (trig, rest)
-
-    return (None, None)
-
-
-def http_post_json(url: str, payload: Dict[str, Any], headers: Dict[str, str], timeout: float) -> Dict[str, Any]:
-    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    req = urllib.request.Request(url, data=data, method="POST")
-    req.add_header("Content-Type", "application/json; charset=utf-8")
-    for k, v in headers.items():
-        req.add_header(k, v)
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        body = resp.read().decode("utf-8", errors="replace")
+    mt = _TRIGGER_RE.match(m)
+    if mt is None:
+        return (None, None)
+    if mt.group("help") is not None:
+        return ("help", "")
+    # allow "@claw: hi" or "@claw- hi"
+    return (mt.group("trig"), mt.group("rest"))
+
+
+class HTTPStatusError(Exception):
+    """Raised for non-2xx HTTP responses from the LLM endpoint."""
+
+    def __init__(self, status: int, reason: str) -> None:
+        super().__init__(f"HTTP Error {status}: {reason}")
+        self.status = status
+
+
+# Persistent keep-alive connections keyed by (scheme, host, port).
+# Reused across retries (and across requests in a long-lived process).
+_CONNS: Dict[Tuple[str, str, Optional[int]], "http.client.HTTPConnection"] = {}
+
+
+# Proxy route per (scheme, host, port): None for a direct connection, else
+# (proxy host, proxy port, Proxy-Authorization headers).
+_PROXIES: Dict[Tuple[str, str, Optional[int]], Optional[Tuple[str, Optional[int], Dict[str, str]]]] = {}
+
+
+def _proxy_for(
+    scheme: str, host: str, port: Optional[int]
+) -> Optional[Tuple[str, Optional[int], Dict[str, str]]]:
+    """Resolve http_proxy / https_proxy / no_proxy the way urllib.request did."""
+    key = (scheme, host, port)
+    if key in _PROXIES:
+        return _PROXIES[key]
+
+    import base64
+    from urllib.parse import unquote, urlsplit
+    from urllib.request import getproxies, proxy_bypass
+
+    route = None
+    proxy = getproxies().get(scheme)
+    if proxy and not proxy_bypass(f"{host}:{port}" if port else host):
+        p = urlsplit(proxy if "://" in proxy else "http://" + proxy)
+        auth: Dict[str, str] = {}
+        if p.username is not None:
+            cred = f"{unquote(p.username)}:{unquote(p.password or '')}"
+            auth["Proxy-Authorization"] = "Basic " + base64.b64encode(cred.encode("utf-8")).decode("ascii")
+        route = (p.hostname or "", p.port, auth)
+    _PROXIES[key] = route
+    return route
+
+
+def _drop_conn(scheme: str, host: str, port: Optional[int]) -> None:
+    conn = _CONNS.pop((scheme, host, port), None)
+    if conn is not None:
+        conn.close()
+
+
+def _open_post(
+    url: str, data: bytes, headers: Dict[str, str], timeout: float
+) -> Tuple[Tuple[str, str, Optional[int]], "http.client.HTTPResponse"]:
+    """POST on a pooled connection and return (pool key, unread response)."""
+    # Imported here rather than at the top: http.client pulls in email and ssl,
+    # which help / no-trigger replies never need.
+    import http.client
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.hostname or "", parts.port)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    proxy = _proxy_for(*key)
+    if proxy is not None and key[0] != "https":
+        # Plain-http proxies take the absolute URI, with credentials per request.
+        path = parts._replace(fragment="").geturl()
+        headers = {**headers, **proxy[2]}
+
+    # A pooled socket may have been closed by the server while idle; in that
+    # case reconnect once immediately instead of burning an HTTP retry.
+    for attempt in range(2):
+        conn = _CONNS.get(key)
+        reused = conn is not None
+        if conn is None:
+            cls = http.client.HTTPSConnection if key[0] == "https" else http.client.HTTPConnection
+            if proxy is None:
+                conn = cls(key[1], key[2], timeout=timeout)
+            else:
+                conn = cls(proxy[0], proxy[1], timeout=timeout)
+                if key[0] == "https":
+                    # CONNECT through the proxy, then TLS to the real host.
+                    conn.set_tunnel(key[1], key[2], headers=proxy[2])
+            _CONNS[key] = conn
         try:
-            return json.loads(body)
+            conn.request("POST", path, body=data, headers=headers)
+            resp = conn.getresponse()
+            break
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            _drop_conn(*key)
+            if not reused or attempt:
+                raise
         except Exception:
-            return {"_raw": body}
+            _drop_conn(*key)
+            raise
 
+    if resp.status >= 400:
+        try:
+            resp.read()
+        except Exception:
+            _drop_conn(*key)
+        raise HTTPStatusError(resp.status, resp.reason)
 
-def call_openai_compat(prompt: str) -> str:
+    return key, resp
+
+
+def http_post_stream(
+    url: str,
+    body: bytes,
+    headers: Dict[str, str],
+    timeout: float,
+    frame_text: Callable[[bytes], Optional[str]],
+    limit: int,
+) -> Tuple[str, str]:
+    """
+    POST a JSON body and accumulate streamed text line by line.
+    frame_text maps one response line to its text piece, or None if the line
+    is not a stream frame (e.g. the server ignored "stream" and sent plain JSON).
+    Stops once the text is `limit` chars long after normalize_for_radio (which
+    is what the chunk budget applies to) and aborts the connection so the
+    server stops generating. Returns (streamed text, non-frame body).
+    """
+    key, resp = _open_post(url, body, headers, timeout)
+
+    pieces: List[str] = []
+    raw: List[bytes] = []
+    n = 0
+    need = limit
+    try:
+        while True:
+            if n >= need:
+                # Raw length overstates what survives whitespace collapsing, so
+                # check the normalized length and keep reading by the shortfall.
+                have = len(normalize_for_radio("".join(pieces)))
+                if have >= limit:
+                    break
+                need = n + (limit - have)
+            line = resp.readline()
+            if not line:
+                # readline() never closes a Content-Length response at EOF;
+                # read() does, which hands the socket back for reuse.
+                resp.read()
+                break
+            line = line.strip()
+            if not line:
+                continue
+            piece = frame_text(line)
+            if piece is None:
+                raw.append(line)
+            elif piece:
+                pieces.append(piece)
+                n += len(piece)
+    finally:
+        # Fully read responses close themselves and leave the socket reusable;
+        # a stream abandoned at `limit` or by an error is dropped.
+        if not resp.isclosed():
+            _drop_conn(*key)
+
+    return "".join(pieces), b"\n".join(raw).decode("utf-8", errors="replace")
+
+
+def parse_json_body(body: str) -> Dict[str, Any]:
+    try:
+        r = _json_loads(body)
+    except Exception:
+        return {"_raw": body}
+    return r if isinstance(r, dict) else {"_raw": body}
+
+
+# Only ~MAX_CHUNKS * MAX_MSG_CHARS chars of normalized text can ever reach the
+# mesh; stop reading the stream shortly after that (slack covers whitespace
+# skipped between chunks).
+STREAM_CHAR_LIMIT = MAX_MSG_CHARS * MAX_CHUNKS + 32
+
+# Placeholder for the user prompt in pre-encoded request bodies. NUL cannot
+# appear in env-provided config, so it never collides with other fields.
+_PROMPT_SLOT = "\x00prompt\x00"
+
+
+def _body_template(payload: Dict[str, Any]) -> Tuple[bytes, bytes]:
+    """Encode a request payload once and split it around _PROMPT_SLOT."""
+    head, _, tail = _json_dumps(payload).partition(_json_dumps(_PROMPT_SLOT))
+    return head, tail
+
+
+def _endpoint_url(suffix: str) -> str:
     base = LLM_ENDPOINT.rstrip("/")
-    url = base if base.endswith("/v1/chat/completions") else (base + "/v1/chat/completions")
+    return base if base.endswith(suffix) else (base + suffix)
+
+
+_HEADERS: Dict[str, str] = {"Content-Type": "application/json; charset=utf-8"}
+if LLM_API_KEY:
+    _HEADERS["Authorization"] = f"Bearer {LLM_API_KEY}"
 
-    headers: Dict[str, str] = {}
-    if LLM_API_KEY:
-        headers["Authorization"] = f"Bearer {LLM_API_KEY}"
 
-    payload = {
+def _stream_answer(
+    url: str,
+    body: bytes,
+    frame_text: Callable[[bytes], Optional[str]],
+    content: Callable[[Dict[str, Any]], Optional[str]],
+) -> str:
+    """One provider request: streamed text, else the non-streamed body via `content`."""
+    text, raw = http_post_stream(url, body, _HEADERS, REQUEST_TIMEOUT_SECONDS, frame_text, STREAM_CHAR_LIMIT)
+    if text.strip():
+        return text.strip()
+    if raw:
+        answer = content(parse_json_body(raw))
+        if answer:
+            return answer
+    return "No response content from LLM."
+
+
+def _with_retries(call: Callable[[], str]) -> str:
+    """Run `call` with up to HTTP_RETRIES retries and jittered exponential backoff."""
+    last_err: Optional[str] = None
+    for i in range(HTTP_RETRIES + 1):
+        try:
+            return call()
+        except HTTPStatusError as e:
+            last_err = str(e)
+            # Client errors (bad URL, model or key) will not fix themselves;
+            # only timeouts and rate limits are worth retrying.
+            if 400 <= e.status < 500 and e.status not in (408, 429):
+                break
+        except Exception as e:
+            last_err = str(e)
+        if i < HTTP_RETRIES:
+            # random costs ~3 ms to import and is only needed once a request
+            # has failed, so it is not imported on the common path.
+            import random
+
+            time.sleep(min(2.0, HTTP_RETRY_SLEEP_SECONDS * (1 << i) + random.random() * 0.1))
+
+    return f"LLM error: {last_err or 'unknown'}"
+
+
+# Raised when a response does not have the shape a fast-path lookup expects.
+_SHAPE_ERRORS = (KeyError, IndexError, TypeError, AttributeError)
+
+
+# SSE comment (": ...", e.g. keep-alives) and non-data field lines: part of the
+# stream, but carry no text.
+_SSE_OTHER_PREFIXES = (b":", b"event:", b"id:", b"retry:")
+
+
+def _openai_frame_text(line: bytes) -> Optional[str]:
+    if not line.startswith(b"data:"):
+        return "" if line.startswith(_SSE_OTHER_PREFIXES) else None
+    data = line[5:].strip()
+    if data == b"[DONE]":
+        return ""
+    try:
+        frame = _json_loads(data)
+    except Exception:
+        return ""
+    try:
+        content = frame["choices"][0]["delta"]["content"]
+    except _SHAPE_ERRORS:
+        return ""
+    return content if type(content) is str else ""
+
+
+def _openai_content(r: Dict[str, Any]) -> Optional[str]:
+    """Extract the answer from a non-streamed OpenAI-compatible response."""
+    try:
+        content = r["choices"][0]["message"]["content"].strip()
+        if content:
+            return content
+    except _SHAPE_ERRORS:
+        pass
+    if isinstance(r.get("text"), str) and r["text"].strip():
+        return r["text"].strip()
+    if isinstance(r.get("_raw"), str) and r["_raw"].strip():
+        return r["_raw"].strip()
+    return None
+
+
+# Everything but the prompt is fixed at import, so encode it once.
+_OPENAI_URL = _endpoint_url("/v1/chat/completions")
+_OPENAI_BODY = _body_template(
+    {
         "model": LLM_MODEL,
         "messages": [
             {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt},
+            {"role": "user", "content": _PROMPT_SLOT},
         ],
         "temperature": 0.2,
         "max_tokens": 220,  # kept modest to reduce latency + keep answers short
+        "stream": True,
     }
+)
 
-    last_err: Optional[str] = None
-    for i in range(HTTP_RETRIES + 1):
-        try:
-            r = http_post_json(url, payload, headers, REQUEST_TIMEOUT_SECONDS)
-            choices = r.get("choices", [])
-            if isinstance(choices, list) and choices:
-                msg = choices[0].get("message", {})
-                if isinstance(msg, dict):
-                    content = msg.get("content")
-                    if isinstance(content, str) and content.strip():
-                        return content.strip()
-            if isinstance(r.get("text"), str) and r["text"].strip():
-                return r["text"].strip()
-            if isinstance(r.get("_raw"), str) and r["_raw"].strip():
-                return r["_raw"].strip()
-            return "No response content from LLM."
-        except Exception as e:
-            last_err = str(e)
-            if i < HTTP_RETRIES:
-                time.sleep(HTTP_RETRY_SLEEP_SECONDS)
 
-    return f"LLM error: {last_err or 'unknown'}"
+def call_openai_compat(prompt: str) -> str:
+    head, tail = _OPENAI_BODY
+    body = head + _json_dumps(prompt) + tail
 
+    return _with_retries(lambda: _stream_answer(_OPENAI_URL, body, _openai_frame_text, _openai_content))
 
-def call_ollama(prompt: str) -> str:
-    base = LLM_ENDPOINT.rstrip("/")
-    url = base if base.endswith("/api/generate") else (base + "/api/generate")
 
-    headers: Dict[str, str] = {}
-    if LLM_API_KEY:
-        headers["Authorization"] = f"Bearer {LLM_API_KEY}"
+_OLLAMA_RESPONSE_KEY = b'"response":"'
+
+
+def _ollama_frame_text(line: bytes) -> Optional[str]:
+    # Fast path: frames are compact JSON and the text piece usually has no
+    # escapes, so slice it out by bytes instead of parsing the whole frame.
+    if line[:1] == b"{":
+        i = line.find(_OLLAMA_RESPONSE_KEY)
+        if i >= 0:
+            j = i + len(_OLLAMA_RESPONSE_KEY)
+            k = line.find(b'"', j)
+            if k >= 0 and line.find(b"\\", j, k) < 0:
+                try:
+                    return line[j:k].decode("utf-8")
+                except UnicodeDecodeError:
+                    pass
+    try:
+        frame = _json_loads(line)
+    except Exception:
+        return None
+    try:
+        text = frame["response"]
+    except _SHAPE_ERRORS:
+        return None
+    return text if type(text) is str else None
+
 
-    payload = {
+def _ollama_content(r: Dict[str, Any]) -> Optional[str]:
+    """Extract the answer from a non-streamed Ollama response."""
+    try:
+        text = r["response"].strip()
+        if text:
+            return text
+    except _SHAPE_ERRORS:
+        pass
+    if isinstance(r.get("_raw"), str) and r["_raw"].strip():
+        return r["_raw"].strip()
+    return None
+
+
+_OLLAMA_URL = _endpoint_url("/api/generate")
+_OLLAMA_BODY = _body_template(
+    {
         "model": LLM_MODEL,
-        "prompt": prompt,
-        "stream": False,
+        "prompt": _PROMPT_SLOT,
+        "stream": True,
         "system": SYSTEM_PROMPT,
         "options": {"temperature": 0.2, "num_predict": 220},
     }
+)
 
-    last_err: Optional[str] = None
-    for i in range(HTTP_RETRIES + 1):
-        try:
-            r = http_post_json(url, payload, headers, REQUEST_TIMEOUT_SECONDS)
-            if isinstance(r.get("response"), str) and r["response"].strip():
-                return r["response"].strip()
-            if isinstance(r.get("_raw"), str) and r["_raw"].strip():
-                return r["_raw"].strip()
-            return "No response content from LLM."
-        except Exception as e:
-            last_err = str(e)
-            if i < HTTP_RETRIES:
-                time.sleep(HTTP_RETRY_SLEEP_SECONDS)
 
-    return f"LLM error: {last_err or 'unknown'}"
+def call_ollama(prompt: str) -> str:
+    head, tail = _OLLAMA_BODY
+    body = head + _json_dumps(prompt) + tail
+
+    return _with_retries(lambda: _stream_answer(_OLLAMA_URL, body, _ollama_frame_text, _ollama_content))
 
 
 def call_llm(prompt: str) -> str:
@@ -319,9 +680,9 @@ def normalize_for_radio(text: str) -> str:
     """Make output more radio-friendly and chunk-friendly."""
     t = (text or "").strip()
     # collapse repeated spaces/tabs
-    t = re.sub(r"[ \t]{2,}", " ", t)
+    t = _MULTI_WS_RE.sub(" ", t)
     # trim line noise
-    t = re.sub(r"\n{3,}", "\n\n", t)
+    t = _MULTI_NL_RE.sub("\n\n", t)
     return t.strip()
 
 
@@ -346,36 +707,70 @@ def ensure_under_limits(answer: str) -> List[str]:
 # ----------------------------
 
 
-def main() -> None:
-    payload = read_stdin_json()
+def process(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle one MeshMonitor payload and return the output object."""
     msg_in = extract_message(payload)
 
     trig, prompt = parse_prompt(msg_in)
+    prompt = (prompt or "").strip()
 
     if trig is None:
         # If your Auto Responder regex is correct, this rarely happens.
         chunks = ensure_under_limits("No trigger. Try: !ask help")
-        out_single(chunks[0])
-        return
+        return {"response": chunks[0]}
 
-    if trig == "help" or (prompt or "").strip().lower() == "help":
-        chunks = ensure_under_limits(help_text())
-        out_single(chunks[0]) if len(chunks) == 1 else out_multi(chunks)
-        return
+    # Only a 4-char prompt can be "help"; don't lowercase whole long prompts.
+    if trig == "help" or (len(prompt) == 4 and prompt.lower() == "help"):
+        return as_result(ensure_under_limits(help_text()))
 
-    if not (prompt or "").strip():
+    if not prompt:
         chunks = ensure_under_limits("Missing prompt. Try: !ask help")
-        out_single(chunks[0])
-        return
+        return {"response": chunks[0]}
+
+    answer = call_llm(prompt)
+    return as_result(ensure_under_limits(answer))
+
+
+def error_result(e: Exception) -> Dict[str, Any]:
+    chunks = ensure_under_limits(f"Error: {e}")
+    return {"response": chunks[0]}
+
+
+def serve() -> None:
+    """
+    Long-lived mode (MM_LLM_BRIDGE_DAEMON=1) for hosts that keep one process
+    running instead of spawning per message. Each request on stdin is a 4-byte
+    big-endian length followed by a JSON payload; each reply is framed the same
+    way on stdout. Exits on EOF.
+    """
+    rd = sys.stdin.buffer
+    wr = sys.stdout.buffer
+    while True:
+        hdr = rd.read(4)
+        if len(hdr) < 4:
+            return
+        n = int.from_bytes(hdr, "big")
+        raw = rd.read(n)
+        if len(raw) < n:
+            return
+        try:
+            result = process(parse_payload(raw))
+        except Exception as e:
+            result = error_result(e)
+        out = _json_dumps(result)
+        wr.write(len(out).to_bytes(4, "big") + out)
+        wr.flush()
 
-    answer = call_llm(prompt.strip())
-    chunks = ensure_under_limits(answer)
-    out_single(chunks[0]) if len(chunks) == 1 else out_multi(chunks)
+
+def main() -> None:
+    if DAEMON_MODE:
+        serve()
+        return
+    out_json(process(read_stdin_json()))
 
 
 if __name__ == "__main__":
     try:
         main()
     except Exception as e:
-        chunks = ensure_under_limits(f"Error: {e}")
-        out_single(chunks[0])
+        out_json(error_result(e))